@@ -0,0 +1,137 @@
+import os
+import sys
+import time
+import pickle
+import random
+import argparse
+from array import array
+from postings import CompressedPostings, FrontCodedVocabulary, intersect
+
+def synthetic_index(num_docs, num_terms, seed=42):
+    # Korpus tiruan dengan sebaran frekuensi Zipf agar panjang postings
+    # menyerupai koleksi jurnal sungguhan (sedikit term sangat umum,
+    # banyak term langka).
+    rng = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    terms = set()
+    while len(terms) < num_terms:
+        terms.add("".join(rng.choice(alphabet) for _ in range(rng.randint(3, 12))))
+    terms = sorted(terms)
+    postings = []
+    for rank in range(num_terms):
+        df = max(1, int(num_docs * 0.6 / (rank + 1) ** 0.9))
+        doc_ids = sorted(rng.sample(range(num_docs), min(df, num_docs)))
+        tfs = [1 + int(rng.expovariate(0.4)) for _ in doc_ids]
+        postings.append((doc_ids, tfs))
+    rng.shuffle(postings)
+    return terms, postings
+
+def persisted_index(path):
+    from indexer import load_index
+    index = load_index(path)
+    if index is None:
+        return None
+    terms = list(index.vocabulary)
+    postings = []
+    for p in index.postings:
+        items = p.items()
+        postings.append(([doc_id for doc_id, _ in items], [tf for _, tf in items]))
+    return terms, postings
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def report_postings(postings, repeat):
+    total = sum(len(doc_ids) for doc_ids, _ in postings)
+    raw_bytes = total * 2 * array("I").itemsize
+    pickled_bytes = len(pickle.dumps(postings, protocol=pickle.HIGHEST_PROTOCOL))
+
+    start = time.perf_counter()
+    compressed = [CompressedPostings(doc_ids, tfs) for doc_ids, tfs in postings]
+    encode_time = time.perf_counter() - start
+    compressed_bytes = sum(p.nbytes() for p in compressed)
+
+    decode_ids = timed(lambda: [p.doc_ids() for p in compressed], repeat)
+    decode_items = timed(lambda: [p.items() for p in compressed], repeat)
+
+    print("Postings")
+    print(f"  entri (doc, tf)        : {total:,}")
+    print(f"  uint32 mentah          : {raw_bytes:,} byte")
+    print(f"  pickle list Python     : {pickled_bytes:,} byte")
+    print(f"  delta + varint + skip  : {compressed_bytes:,} byte")
+    print(f"  rasio vs uint32        : {raw_bytes / compressed_bytes:.2f}x")
+    print(f"  rasio vs pickle        : {pickled_bytes / compressed_bytes:.2f}x")
+    print(f"  encode                 : {total / encode_time / 1e6:.2f} juta entri/detik")
+    print(f"  decode doc id          : {total / decode_ids / 1e6:.2f} juta entri/detik")
+    print(f"  decode doc id + tf     : {total / decode_items / 1e6:.2f} juta entri/detik")
+    return compressed
+
+def report_intersection(postings, compressed, repeat, pairs=200, seed=7):
+    rng = random.Random(seed)
+    # Pasangan term umum vs term yang lebih jarang: kasus di mana skip
+    # pointer paling berguna.
+    order = sorted(range(len(compressed)), key=lambda i: -len(compressed[i]))
+    frequent = order[:max(1, len(order) // 100)]
+    candidates = order[:max(1, len(order) // 10)]
+    chosen = [(rng.choice(frequent), rng.choice(candidates)) for _ in range(pairs)]
+
+    def with_skips():
+        return [intersect(compressed[a], compressed[b]) for a, b in chosen]
+
+    def decode_then_merge():
+        return [sorted(set(compressed[a].doc_ids()) & set(compressed[b].doc_ids())) for a, b in chosen]
+
+    if with_skips() != decode_then_merge():
+        raise AssertionError("hasil intersect tidak sama")
+    skip_time = timed(with_skips, repeat)
+    merge_time = timed(decode_then_merge, repeat)
+    print("Intersect")
+    print(f"  pasangan term          : {pairs}")
+    print(f"  dengan skip pointer    : {skip_time / pairs * 1e6:.1f} us/pasangan")
+    print(f"  decode penuh + set     : {merge_time / pairs * 1e6:.1f} us/pasangan")
+
+def report_vocabulary(terms, repeat):
+    raw_bytes = sum(len(t.encode("utf-8")) for t in terms) + len(terms) * array("I").itemsize
+    vocabulary = FrontCodedVocabulary(terms)
+    sample = terms[::max(1, len(terms) // 2000)]
+    lookup = timed(lambda: [vocabulary.index(t) for t in sample], repeat)
+    print("Kosakata")
+    print(f"  jumlah term            : {len(terms):,}")
+    print(f"  string + offset uint32 : {raw_bytes:,} byte")
+    print(f"  front-coded            : {vocabulary.nbytes():,} byte")
+    print(f"  rasio                  : {raw_bytes / vocabulary.nbytes():.2f}x")
+    print(f"  lookup term -> id      : {lookup / len(sample) * 1e6:.1f} us/term")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark kompresi postings dan kosakata")
+    parser.add_argument("--index", help="pakai index tersimpan (mis. index_data/index.pkl)")
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--terms", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    data = None
+    if args.index:
+        if not os.path.exists(args.index):
+            parser.error(f"index {args.index} tidak ditemukan")
+        data = persisted_index(args.index)
+        if data is None:
+            parser.error(f"index {args.index} tidak dapat dibaca")
+        print(f"Sumber: {args.index}")
+    else:
+        data = synthetic_index(args.docs, args.terms)
+        print(f"Sumber: korpus sintetis {args.docs} dokumen, {args.terms} term")
+    terms, postings = data
+
+    compressed = report_postings(postings, args.repeat)
+    report_intersection(postings, compressed, args.repeat)
+    report_vocabulary(terms, args.repeat)
+
+if __name__ == "__main__":
+    sys.exit(main())
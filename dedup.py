@@ -0,0 +1,112 @@
+import zlib
+import random
+from array import array
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 128
+BANDS = 16
+ROWS = NUM_PERMUTATIONS // BANDS
+SIMILARITY_THRESHOLD = 0.8
+
+DEDUP_MODES = ("off", "collapse", "exclude")
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+def _permutations(seed=1):
+    # Koefisien tetap (seed konstan) agar signature yang tersimpan di index
+    # tetap bisa dibandingkan dengan signature dokumen yang diindex kemudian.
+    rng = random.Random(seed)
+    return [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERMUTATIONS)]
+
+_PERMUTATIONS = _permutations()
+
+def shingle_hashes(tokens, size=SHINGLE_SIZE):
+    if len(tokens) < size:
+        return {zlib.crc32(" ".join(tokens).encode("utf-8"))} if tokens else set()
+    return {zlib.crc32(" ".join(tokens[i:i + size]).encode("utf-8")) for i in range(len(tokens) - size + 1)}
+
+def minhash_signature(tokens):
+    hashes = shingle_hashes(tokens)
+    if not hashes:
+        return None
+    return array("I", (
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ))
+
+def estimated_similarity(a, b):
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+def find_duplicate_clusters(signatures, threshold=SIMILARITY_THRESHOLD):
+    # signatures: list (key, signature, panjang dokumen). Hanya pasangan yang
+    # berbagi minimal satu band LSH yang dibandingkan, jadi biayanya tidak
+    # kuadratik terhadap jumlah dokumen.
+    buckets = {}
+    for position, (_, signature, _) in enumerate(signatures):
+        if signature is None:
+            continue
+        for band in range(BANDS):
+            key = (band, bytes(signature[band * ROWS:(band + 1) * ROWS]))
+            buckets.setdefault(key, []).append(position)
+
+    parent = list(range(len(signatures)))
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    similarity = {}
+    checked = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for i in range(len(members)):
+            for j in range(i + 1, len(members)):
+                pair = (members[i], members[j])
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                score = estimated_similarity(signatures[pair[0]][1], signatures[pair[1]][1])
+                if score >= threshold:
+                    similarity[pair] = score
+                    ra, rb = find(pair[0]), find(pair[1])
+                    if ra != rb:
+                        parent[rb] = ra
+
+    groups = {}
+    for position in range(len(signatures)):
+        root = find(position)
+        groups.setdefault(root, []).append(position)
+
+    clusters = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        # Dokumen kanonik: teks terpanjang (biasanya versi paling lengkap).
+        members.sort(key=lambda p: (-signatures[p][2], str(signatures[p][0])))
+        scores = [s for (a, b), s in similarity.items() if a in members and b in members]
+        clusters.append({
+            "canonical": signatures[members[0]][0],
+            "members": [signatures[p][0] for p in members],
+            "similarity": round(min(scores), 4) if scores else 1.0
+        })
+    clusters.sort(key=lambda c: str(c["canonical"]))
+    return clusters
+
+def collapse_results(results, cluster_of):
+    # Hasil sudah terurut skor; anggota klaster berikutnya dilipat ke dalam
+    # hasil pertama (skor tertinggi) dari klaster yang sama.
+    collapsed = []
+    first = {}
+    for res in results:
+        cluster = cluster_of.get(res["filename"])
+        if cluster is None:
+            collapsed.append(res)
+        elif cluster in first:
+            first[cluster].setdefault("duplicates", []).append(res["filename"])
+        else:
+            first[cluster] = res
+            collapsed.append(res)
+    return collapsed
@@ -0,0 +1,123 @@
+import os
+import threading
+from array import array
+from collections import Counter
+from itertools import combinations
+from indexer import INDEX_DIR, atomic_pickle, load_pickle
+from postings import FrontCodedVocabulary
+
+EXPANSION_PATH = os.path.join(INDEX_DIR, "expansion.pkl")
+EXPANSION_FORMAT = 1
+
+TOP_NEIGHBORS = 5
+TERMS_PER_DOC = 60
+MIN_DOC_FREQ = 2
+MAX_DOC_RATIO = 0.5
+MIN_COOCCURRENCE = 2
+MIN_ASSOCIATION = 0.1
+
+EXPANSION_WEIGHT = 0.5
+EXPANSION_TERMS = 2
+
+class CooccurrenceTable:
+    # Tabel top-N tetangga per term. Term disimpan front-coded; tetangga
+    # term ke-i berada di neighbor_ids/scores[offsets[i]:offsets[i + 1]],
+    # dengan neighbor_ids merujuk ke kosakata tabel yang sama.
+    def __init__(self, neighbors, generation=0):
+        terms = sorted(neighbors)
+        term_ids = {term: term_id for term_id, term in enumerate(terms)}
+        self.generation = generation
+        self.vocabulary = FrontCodedVocabulary(terms)
+        self.offsets = array("I", [0])
+        self.neighbor_ids = array("I")
+        self.scores = array("f")
+        for term in terms:
+            for neighbor, score in neighbors[term]:
+                self.neighbor_ids.append(term_ids[neighbor])
+                self.scores.append(score)
+            self.offsets.append(len(self.neighbor_ids))
+
+    def __len__(self):
+        return len(self.vocabulary)
+
+    def neighbors(self, term):
+        term_id = self.vocabulary.index(term)
+        if term_id < 0:
+            return []
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        return [(self.vocabulary[self.neighbor_ids[i]], self.scores[i]) for i in range(start, end)]
+
+    def nbytes(self):
+        return (self.vocabulary.nbytes() + self.offsets.itemsize * len(self.offsets)
+                + self.neighbor_ids.itemsize * len(self.neighbor_ids) + self.scores.itemsize * len(self.scores))
+
+def build_cooccurrence_table(index, top_n=TOP_NEIGHBORS, terms_per_doc=TERMS_PER_DOC):
+    # Asosiasi Dice atas kemunculan bersama di dokumen yang sama:
+    # 2 * |Da & Db| / (|Da| + |Db|). Agar jumlah pasangan tetap terkendali,
+    # tiap dokumen hanya menyumbang term paling sering kemunculannya, dan
+    # term yang terlalu jarang atau ada di lebih dari separuh koleksi
+    # (bobot BIM-nya tidak positif) diabaikan. Term teratas per dokumen
+    # diambil lewat index sendiri, sehingga index dengan shard juga bisa.
+    doc_freq = index.global_doc_freq
+    max_df = max(MIN_DOC_FREQ, int(index.total_docs * MAX_DOC_RATIO))
+    eligible = {term for term, df in doc_freq.items() if MIN_DOC_FREQ <= df <= max_df}
+    pair_counts = Counter()
+    for top_terms in index.top_document_terms(eligible, terms_per_doc):
+        pair_counts.update(combinations(sorted(top_terms), 2))
+
+    candidates = {}
+    for (a, b), count in pair_counts.items():
+        if count < MIN_COOCCURRENCE:
+            continue
+        score = 2.0 * count / (doc_freq[a] + doc_freq[b])
+        if score < MIN_ASSOCIATION:
+            continue
+        candidates.setdefault(a, []).append((score, b))
+        candidates.setdefault(b, []).append((score, a))
+
+    neighbors = {}
+    for term, scored in candidates.items():
+        scored.sort(key=lambda x: (-x[0], x[1]))
+        neighbors[term] = [(other, score) for score, other in scored[:top_n]]
+    return CooccurrenceTable(neighbors, index.generation)
+
+def save_expansion_table(table, path=EXPANSION_PATH):
+    atomic_pickle(path, {"format": EXPANSION_FORMAT, "table": table})
+
+def load_expansion_table(path=EXPANSION_PATH):
+    payload = load_pickle(path, EXPANSION_FORMAT, "Tabel ekspansi")
+    return payload["table"] if payload is not None else None
+
+_cache_lock = threading.Lock()
+_cache = {}
+
+def get_expansion_table(path=EXPANSION_PATH):
+    # Dibaca ulang hanya jika file berubah, sehingga job offline bisa
+    # memperbarui tabel tanpa me-restart server.
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, load_expansion_table(path))
+            _cache[path] = cached
+        return cached[1]
+
+def expand_query(query_tokens, table, st_values, max_terms=EXPANSION_TERMS, weight=EXPANSION_WEIGHT):
+    # Hasilnya faktor pengali bobot BIM per term: term query asli 1.0,
+    # tetangga terkuat mendapat weight * skor asosiasi.
+    boosts = {term: 1.0 for term in query_tokens}
+    if table is None:
+        return boosts
+    for term in query_tokens:
+        added = 0
+        for neighbor, score in table.neighbors(term):
+            if added >= max_terms:
+                break
+            if neighbor in query_tokens or neighbor not in st_values:
+                continue
+            boosts[neighbor] = max(boosts.get(neighbor, 0.0), weight * score)
+            added += 1
+    return boosts
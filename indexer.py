@@ -0,0 +1,669 @@
+import os
+import re
+import math
+import pickle
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from collections import Counter
+import pdfplumber
+import docx
+from postings import CompressedPostings, FrontCodedVocabulary
+from spelling import DICTIONARY, SymSpellIndex
+from dedup import collapse_results, find_duplicate_clusters, minhash_signature
+from snippets import SnippetWriter, build_snippet_blob, close_snippet_stores, open_snippet_stores, prune_snippet_stores, read_snippet_blob, snippet_path
+
+logging.getLogger("pdfminer").setLevel(logging.ERROR)
+
+FOLDER_PATH = "JournalMedis"
+INDEX_DIR = "index_data"
+INDEX_PATH = os.path.join(INDEX_DIR, "index.pkl")
+INDEX_FORMAT = 5
+SPELLER_FORMAT = 1
+
+def load_stopwords(path):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return set(word.strip().lower() for word in f.read().splitlines() if word.strip())
+    return set()
+
+class INIdrisStemmer:
+    def __init__(self):
+        self.dictionary = set()
+        self.load_dictionary("kata-dasar.txt")
+        self.suffixes_list = sorted([
+            "an","at","i", "iah", "ilah", "in","is","isme","kan","lah","nya","wan","wi", "tah", "ku", "mu"
+        ], key=len, reverse=True)
+        self.prefixes_list = sorted([
+            "be","bel","ber","di","dwi","ke","me","mem","men","meng","meny","mono","pe","pel","pem","pen","peng","peny","per","pra","pro","se","sub","ter"
+        ], key=len, reverse=True)
+
+    def load_dictionary(self, path):
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                words = f.read().splitlines()
+                self.dictionary = set(word.strip().lower() for word in words if word.strip())
+
+    def is_vowel(self, char):
+        return char.lower() in 'aiueo'
+
+    def remove_suffix(self, word):
+        for suffix in self.suffixes_list:
+            if word.endswith(suffix):
+                if len(word) > len(suffix):
+                    return word[:-len(suffix)]
+        return word
+
+    def remove_prefix(self, word):
+        for prefix in self.prefixes_list:
+            if word.startswith(prefix):
+                if len(word) > len(prefix):
+                    return word[len(prefix):]
+        return word
+
+    def apply_rule2(self, word):
+        if (word.startswith("men") or word.startswith("pen")) and len(word) > 3 and self.is_vowel(word[3]):
+            return "t" + word[3:]
+        if (word.startswith("meng") or word.startswith("peng")) and len(word) > 4 and self.is_vowel(word[4]):
+            return "k" + word[4:]
+        if (word.startswith("meny") or word.startswith("peny")) and len(word) > 4 and self.is_vowel(word[4]):
+            return "s" + word[4:]
+        if (word.startswith("mem") or word.startswith("pem")) and len(word) > 3 and self.is_vowel(word[3]):
+            return "p" + word[3:]
+        return word
+
+    def stem(self, word):
+        current_word = word
+        if current_word in self.dictionary:
+            return current_word
+        for prefix in self.prefixes_list:
+            if current_word.startswith(prefix):
+                if len(current_word) > len(prefix):
+                    candidate = current_word[len(prefix):]
+                    if candidate in self.dictionary:
+                        return candidate
+        processed_rule2 = self.apply_rule2(current_word)
+        if processed_rule2 != current_word:
+            if processed_rule2 in self.dictionary:
+                return processed_rule2
+            prefix_rule2 = self.remove_prefix(processed_rule2)
+            if prefix_rule2 in self.dictionary:
+                return prefix_rule2
+        processed_suffix = self.remove_suffix(current_word)
+        if processed_suffix != current_word:
+            if len(processed_suffix) > 1:
+                return self.stem(processed_suffix)
+        return word
+
+# Kamus kata dasar dan stopwords cukup dibaca sekali per proses,
+# bukan setiap kali sebuah dokumen atau query diproses.
+_stemmer = None
+_stopwords = None
+
+def get_stemmer():
+    global _stemmer
+    if _stemmer is None:
+        _stemmer = INIdrisStemmer()
+    return _stemmer
+
+def get_stopwords():
+    global _stopwords
+    if _stopwords is None:
+        _stopwords = load_stopwords("stopwords.txt")
+    return _stopwords
+
+def cleanse_text(case_folded_text):
+    # Setiap penggantian bersifat satu karakter ke satu karakter, sehingga
+    # posisi token di teks hasil cleansing sama dengan posisinya di teks asli.
+    temp_text = re.sub(r'(?<=\d),(?=\d)', '.', case_folded_text)
+    temp_text = re.sub(r'(?<!\d)\.|\.(?!\d)', ' ', temp_text)
+    temp_text = temp_text.replace("-", " ")
+    return re.sub(r"[^a-zA-Z0-9\s\.]", " ", temp_text)
+
+def get_preprocessing_steps(text):
+    stemmer = get_stemmer()
+    stopwords = get_stopwords()
+
+    case_folded_text = text.lower()
+
+    cleansed_text = cleanse_text(case_folded_text)
+
+    tokens = cleansed_text.split()
+
+    filtered = []
+    for t in tokens:
+        t_clean = t.strip()
+        if t_clean and t_clean not in stopwords:
+            if len(t_clean) > 1 or t_clean.replace('.', '', 1).isdigit():
+                filtered.append(t_clean)
+
+    stemmed = []
+    for t in filtered:
+        if re.match(r'^\d+(\.\d+)?%?$', t):
+            stemmed.append(t)
+        else:
+            res = stemmer.stem(t)
+            if res and len(res) > 0:
+                stemmed.append(res)
+            else:
+                stemmed.append(t)
+
+    final_tokens = [t for t in stemmed if len(t) > 1 or t.replace('.', '', 1).isdigit()]
+
+    return {
+        'original': text,
+        'cleansed': cleansed_text,
+        'tokens': tokens,
+        'filtered': filtered,
+        'stemmed': final_tokens,
+        'pairs': list(zip(filtered, final_tokens))
+    }
+
+def get_token_spans(text):
+    # Sama dengan kolom 'stemmed' get_preprocessing_steps, ditambah posisi
+    # (awal, akhir) tiap token pada teks yang dikembalikan.
+    stemmer = get_stemmer()
+    stopwords = get_stopwords()
+
+    case_folded_text = text.lower()
+    if len(case_folded_text) != len(text):
+        text = case_folded_text
+    cleansed_text = cleanse_text(case_folded_text)
+
+    spans = []
+    for match in re.finditer(r'\S+', cleansed_text):
+        t = match.group()
+        if t in stopwords or not (len(t) > 1 or t.replace('.', '', 1).isdigit()):
+            continue
+        if re.match(r'^\d+(\.\d+)?%?$', t):
+            res = t
+        else:
+            res = stemmer.stem(t) or t
+        if len(res) > 1 or res.replace('.', '', 1).isdigit():
+            spans.append((res, match.start(), match.end()))
+    return text, spans
+
+def extract_text(filename, folder=FOLDER_PATH):
+    full_path = os.path.join(folder, filename)
+    text = ""
+    try:
+        if filename.endswith(".txt"):
+            with open(full_path, "r", encoding="utf-8") as f:
+                text = f.read()
+        elif filename.endswith(".pdf"):
+            with pdfplumber.open(full_path) as pdf:
+                for page in pdf.pages:
+                    txt = page.extract_text()
+                    if txt: text += txt + " "
+        elif filename.endswith(".docx"):
+            doc = docx.Document(full_path)
+            for para in doc.paragraphs:
+                text += para.text + " "
+    except Exception as e:
+        logging.getLogger(__name__).warning("Error reading %s: %s", filename, e)
+    return text
+
+def list_files(folder=FOLDER_PATH):
+    if not os.path.exists(folder):
+        return []
+    return sorted(f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder, f)))
+
+def file_signature(filename, folder=FOLDER_PATH):
+    stat = os.stat(os.path.join(folder, filename))
+    return (stat.st_mtime_ns, stat.st_size)
+
+def index_document(filename, folder=FOLDER_PATH):
+    text = extract_text(filename, folder)
+    if not text:
+        return None
+    text, spans = get_token_spans(text)
+    final_tokens = [stem for stem, _, _ in spans]
+    unique_tokens = set(final_tokens)
+    return {
+        "filename": filename,
+        "terms": unique_tokens,
+        "unique_terms": len(unique_tokens),
+        "count_base": len(final_tokens),
+        "freq": Counter(final_tokens),
+        "minhash": minhash_signature(final_tokens),
+        "snippet_blob": build_snippet_blob(text, spans),
+        "signature": file_signature(filename, folder)
+    }
+
+def store_snippet(doc, writer, previous_ref=None):
+    # Blob snippet ditulis ke file generasi baru begitu dokumen selesai
+    # diproses, agar teks lengkap tidak menumpuk di memori selama build.
+    blob = doc.pop("snippet_blob", None)
+    if blob is None and previous_ref is not None:
+        try:
+            blob = read_snippet_blob(previous_ref)
+        except OSError:
+            blob = None
+    doc["snippet_ref"] = writer.write(blob) if writer is not None and blob is not None else None
+    return doc
+
+def compute_st_values(global_doc_freq, total_docs):
+    st_values = {}
+    for term in global_doc_freq:
+        Dt = global_doc_freq[term]
+        st = (Dt + 0.5) / (total_docs + 1.0)
+        st_values[term] = st
+    return st_values
+
+def bim_weight(st):
+    return math.log10((1 - st) / st)
+
+def compress_documents(raw_docs):
+    # Set "terms" dan Counter "freq" per dokumen diganti postings terkompresi
+    # (term -> doc id + tf) dan forward index terkompresi (doc -> term id + tf)
+    # yang merujuk ke kosakata front-coded.
+    terms = sorted(set().union(*(doc["freq"] for doc in raw_docs)))
+    term_ids = {term: term_id for term_id, term in enumerate(terms)}
+    posting_docs = [[] for _ in terms]
+    posting_tfs = [[] for _ in terms]
+    doc_database = []
+    for doc_id, doc in enumerate(raw_docs):
+        forward_ids = sorted(term_ids[term] for term in doc["freq"])
+        forward_tfs = []
+        for term_id in forward_ids:
+            tf = doc["freq"][terms[term_id]]
+            forward_tfs.append(tf)
+            posting_docs[term_id].append(doc_id)
+            posting_tfs[term_id].append(tf)
+        doc_database.append({
+            "filename": doc["filename"],
+            "unique_terms": doc["unique_terms"],
+            "count_base": doc["count_base"],
+            "signature": doc["signature"],
+            "minhash": doc["minhash"],
+            "snippet_ref": doc["snippet_ref"],
+            "forward": CompressedPostings(forward_ids, forward_tfs)
+        })
+    postings = [CompressedPostings(ids, tfs) for ids, tfs in zip(posting_docs, posting_tfs)]
+    return FrontCodedVocabulary(terms), postings, doc_database
+
+class IndexGeneration:
+    # Satu generasi index bersifat read-only setelah dibuat. Rebuild selalu
+    # menghasilkan objek baru, sehingga query yang sedang berjalan tetap
+    # memakai generasi lama secara utuh sampai selesai.
+    def __init__(self, generation, doc_database, built_at=None, vocabulary=None, postings=None, dedup="off"):
+        self._lock = threading.Lock()
+        self._active = 0
+        self._retired = False
+        self._closed = False
+        if vocabulary is None:
+            vocabulary, postings, doc_database = compress_documents(doc_database)
+        self.generation = generation
+        self.built_at = built_at if built_at is not None else time.time()
+        self.doc_database = doc_database
+        self.total_docs = len(doc_database)
+        self.vocabulary = vocabulary
+        self.postings = postings
+        self.global_doc_freq = Counter(dict(zip(vocabulary, (len(p) for p in postings))))
+        self.doc_by_filename = {doc["filename"]: doc for doc in doc_database}
+        self.snippet_stores = open_snippet_stores(doc["snippet_ref"] for doc in doc_database)
+        self.set_duplicates(dedup, find_duplicate_clusters(
+            [(doc["filename"], doc["minhash"], doc["count_base"]) for doc in doc_database]
+        ))
+        if dedup == "exclude" and self.duplicate_clusters:
+            self.exclude_duplicates(self._cluster_term_counts())
+        self.st_values = compute_st_values(self.global_doc_freq, self.total_docs)
+
+    def set_duplicates(self, dedup, clusters):
+        self.dedup = dedup
+        self.duplicate_clusters = clusters
+        self.cluster_of = {}
+        for cluster_id, cluster in enumerate(clusters):
+            for filename in cluster["members"]:
+                self.cluster_of[filename] = cluster_id
+        self.duplicate_count = sum(len(c["members"]) - 1 for c in clusters)
+
+    def _cluster_term_counts(self):
+        doc_ids = {doc["filename"]: doc_id for doc_id, doc in enumerate(self.doc_database)}
+        terms = list(self.vocabulary)
+        counts = []
+        for cluster in self.duplicate_clusters:
+            cluster_counts = Counter()
+            for filename in cluster["members"]:
+                cluster_counts.update(self.document_freq(doc_ids[filename], terms).keys())
+            counts.append(cluster_counts)
+        return counts
+
+    def exclude_duplicates(self, cluster_term_counts):
+        # Satu klaster near-duplicate dihitung sebagai satu dokumen, baik
+        # untuk |D| maupun |Dt| setiap term yang muncul di anggotanya.
+        for counts in cluster_term_counts:
+            for term, count in counts.items():
+                self.global_doc_freq[term] -= count - 1
+        self.total_docs -= self.duplicate_count
+
+    def top_document_terms(self, eligible, limit):
+        # Per dokumen: term dari eligible dengan tf tertinggi (seri diurutkan
+        # menurut term), untuk tabel ko-okurensi ekspansi query.
+        terms = list(self.vocabulary)
+        for doc in self.doc_database:
+            items = [(terms[term_id], tf) for term_id, tf in doc["forward"].items() if terms[term_id] in eligible]
+            items.sort(key=lambda x: (-x[1], x[0]))
+            yield [term for term, _ in items[:limit]]
+
+    def term_postings(self, term):
+        term_id = self.vocabulary.index(term)
+        if term_id < 0:
+            return None
+        return self.postings[term_id]
+
+    def document_freq(self, doc_id, terms=None):
+        if terms is None:
+            terms = self.vocabulary
+        return Counter({terms[term_id]: tf for term_id, tf in self.doc_database[doc_id]["forward"].items()})
+
+    def raw_document(self, doc_id, terms=None):
+        doc = self.doc_database[doc_id]
+        freq = self.document_freq(doc_id, terms)
+        return {
+            "filename": doc["filename"],
+            "terms": set(freq),
+            "unique_terms": doc["unique_terms"],
+            "count_base": doc["count_base"],
+            "freq": freq,
+            "minhash": doc["minhash"],
+            "snippet_ref": doc["snippet_ref"],
+            "signature": doc["signature"]
+        }
+
+    def search(self, query_tokens, top_k=None, boosts=None):
+        scores = {}
+        matches = {}
+        for term in query_tokens:
+            if term not in self.st_values:
+                continue
+            st = self.st_values[term]
+            weight = bim_weight(st)
+            if boosts is not None:
+                weight *= boosts.get(term, 1.0)
+            for doc_id in self.term_postings(term).doc_ids():
+                scores[doc_id] = scores.get(doc_id, 0) + weight
+                matches.setdefault(doc_id, []).append((term, st))
+
+        results = []
+        for doc_id in sorted(scores):
+            if scores[doc_id] > 0:
+                results.append({
+                    "filename": self.doc_database[doc_id]["filename"],
+                    "score": scores[doc_id],
+                    "matches": matches[doc_id]
+                })
+        results.sort(key=lambda x: x["score"], reverse=True)
+        if self.dedup != "off":
+            results = collapse_results(results, self.cluster_of)
+        if top_k is not None:
+            results = results[:top_k]
+        return results
+
+    # Generasi di memori tidak memegang resource apa pun; ShardedIndex
+    # memakai hook ini untuk menutup proses worker setelah query terakhir.
+    # Generasi yang sudah dipensiunkan ditutup begitu query terakhir yang
+    # memakainya selesai; handle file snippet-nya ikut dilepas.
+    def acquire(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Generasi index sudah ditutup")
+            self._active += 1
+
+    def release(self):
+        with self._lock:
+            self._active -= 1
+            close_now = self._retired and self._active == 0
+        if close_now:
+            self.close()
+
+    def retire(self):
+        with self._lock:
+            self._retired = True
+            close_now = self._active == 0
+        if close_now:
+            self.close()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return False
+            self._closed = True
+        close_snippet_stores(self.snippet_stores)
+        return True
+
+def build_generation(generation, folder=FOLDER_PATH, previous=None, progress=None, dedup="off", snippet_file=None):
+    files = list_files(folder)
+    reusable = {}
+    previous_terms = []
+    if previous is not None and previous.total_docs:
+        reusable = {doc["filename"]: doc_id for doc_id, doc in enumerate(previous.doc_database)}
+        previous_terms = list(previous.vocabulary)
+
+    writer = SnippetWriter(snippet_file) if snippet_file else None
+    doc_database = []
+    try:
+        for i, file in enumerate(files, 1):
+            if progress:
+                progress(i, len(files), file)
+            doc_id = reusable.get(file)
+            previous_ref = None
+            if doc_id is not None and previous.doc_database[doc_id]["signature"] == file_signature(file, folder):
+                doc = previous.raw_document(doc_id, previous_terms)
+                previous_ref = doc.pop("snippet_ref")
+            else:
+                doc = index_document(file, folder)
+            if doc is None:
+                continue
+            doc_database.append(store_snippet(doc, writer, previous_ref))
+    except Exception:
+        if writer is not None:
+            writer.abort()
+        raise
+    if writer is not None:
+        writer.close()
+    return IndexGeneration(generation, doc_database, dedup=dedup)
+
+def atomic_pickle(path, payload):
+    # Ditulis ke file sementara lalu di-rename agar file di disk tidak
+    # pernah setengah jadi jika proses terhenti saat menulis.
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+def load_pickle(path, expected_format, label):
+    # None jika file belum ada, tidak dapat dibaca, atau formatnya berbeda;
+    # pemanggil lalu membangun ulang dari awal.
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except Exception as e:
+        logging.getLogger(__name__).warning("%s %s tidak dapat dibaca: %s", label, path, e)
+        return None
+    if not isinstance(payload, dict) or payload.get("format") != expected_format:
+        return None
+    return payload
+
+def save_index(index, path=INDEX_PATH):
+    atomic_pickle(path, {
+        "format": INDEX_FORMAT,
+        "generation": index.generation,
+        "built_at": index.built_at,
+        "doc_database": index.doc_database,
+        "vocabulary": index.vocabulary,
+        "postings": index.postings
+    })
+
+def load_index(path=INDEX_PATH, dedup="off"):
+    payload = load_pickle(path, INDEX_FORMAT, "Index")
+    if payload is None:
+        return None
+    return IndexGeneration(payload["generation"], payload["doc_database"], payload["built_at"],
+                           payload["vocabulary"], payload["postings"], dedup)
+
+def build_speller(index, base=None):
+    # base: indeks ejaan tersimpan dari build sebelumnya; kata dasar sudah
+    # ada di dalamnya sehingga cukup term baru yang ditambahkan. Term yang
+    # hilang dari index tersaring saat koreksi karena tidak ada di generasi
+    # aktif.
+    speller = base
+    if speller is None:
+        speller = SymSpellIndex()
+        speller.update(get_stemmer().dictionary, DICTIONARY)
+    speller.update(index.st_values)
+    return speller
+
+def save_speller(speller, path):
+    atomic_pickle(path, {"format": SPELLER_FORMAT, "speller": speller.compact()})
+
+def load_speller(path):
+    payload = load_pickle(path, SPELLER_FORMAT, "Indeks ejaan")
+    return payload["speller"] if payload is not None else None
+
+class IndexManager:
+    def __init__(self, folder=FOLDER_PATH, index_path=INDEX_PATH, shards=0, dedup="off", spelling=True):
+        self.folder = folder
+        self.index_path = index_path
+        self.shards = shards
+        self.dedup = dedup
+        self.spelling = spelling
+        self._lock = threading.Lock()
+        self._worker = None
+        self.speller = None
+        self._current = self._load() or IndexGeneration(0, [])
+        if spelling:
+            speller = load_speller(self._speller_path())
+            if speller is not None:
+                self.speller = build_speller(self._current, speller)
+        self._status = {
+            "state": "ready" if self._current.generation > 0 else "empty",
+            "processed": 0,
+            "total": 0,
+            "current_file": "",
+            "error": None
+        }
+
+    def _index_dir(self):
+        return os.path.dirname(self.index_path)
+
+    def _speller_path(self):
+        return os.path.join(self._index_dir(), "speller.pkl")
+
+    def _shard_path(self):
+        return os.path.join(self._index_dir(), "shard-{}.pkl")
+
+    def _load(self):
+        if not self.shards:
+            return load_index(self.index_path, self.dedup)
+        from sharding import ShardedIndex
+        index = ShardedIndex(self.shards, self.folder, self.dedup)
+        try:
+            if index.load(self._shard_path()) is not None:
+                return index
+        except Exception as e:
+            logging.getLogger(__name__).warning("Shard index tidak dapat dibaca: %s", e)
+        index.close()
+        return None
+
+    def _build(self, previous, full=False):
+        generation = previous.generation + 1
+        if not self.shards:
+            new_index = build_generation(generation, self.folder, None if full else previous, self._progress, self.dedup,
+                                         snippet_path(self._index_dir(), generation))
+            save_index(new_index, self.index_path)
+            return new_index
+        from sharding import ShardedIndex
+        new_index = ShardedIndex(self.shards, self.folder, self.dedup)
+        try:
+            new_index.build(generation, self._progress, self._index_dir(), None if full else self._shard_path())
+            new_index.save(self._shard_path())
+        except Exception:
+            new_index.close()
+            raise
+        return new_index
+
+    @property
+    def current(self):
+        return self._current
+
+    @contextmanager
+    def snapshot(self):
+        with self._lock:
+            current = self._current
+            current.acquire()
+        try:
+            yield current
+        finally:
+            current.release()
+
+    def status(self):
+        with self._lock:
+            status = dict(self._status)
+        status["generation"] = self._current.generation
+        status["total_docs"] = self._current.total_docs
+        status["percent"] = round(status["processed"] / status["total"] * 100, 1) if status["total"] else 0.0
+        return status
+
+    def is_building(self):
+        return self._worker is not None and self._worker.is_alive()
+
+    def start_refresh(self, full=False):
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return False
+            self._status.update(state="indexing", processed=0, total=0, current_file="", error=None)
+            self._worker = threading.Thread(target=self._run, args=(full,), name="index-builder", daemon=True)
+            self._worker.start()
+        return True
+
+    def wait(self, timeout=None):
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+
+    def _progress(self, processed, total, filename):
+        with self._lock:
+            self._status.update(processed=processed, total=total, current_file=filename)
+
+    def _run(self, full=False):
+        previous = self._current
+        new_index = None
+        try:
+            new_index = self._build(previous, full)
+            # Indeks ejaan dibangun sekali saat indexing lalu disimpan. Objek
+            # baru selalu dibuat (dari salinan di disk), karena speller yang
+            # aktif sedang dibaca oleh query.
+            speller = build_speller(new_index, None if full else load_speller(self._speller_path())).compact()
+            save_speller(speller, self._speller_path())
+        except Exception as e:
+            logging.getLogger(__name__).exception("Indexing gagal")
+            # Generasi yang sudah jadi tetapi tidak dipasang harus ditutup,
+            # termasuk proses worker shard-nya.
+            if new_index is not None:
+                new_index.close()
+            with self._lock:
+                self._status.update(state="error", error=str(e))
+            return
+        # Pertukaran referensi bersifat atomik; query baru langsung memakai
+        # generasi baru sementara query lama menyelesaikan generasi sebelumnya.
+        with self._lock:
+            self._current = new_index
+            if self.spelling:
+                self.speller = speller
+            self._status.update(state="ready", current_file="")
+        previous.retire()
+        # Snippet generasi sebelumnya masih disimpan untuk query yang sedang
+        # berjalan. File yang lebih lama boleh dihapus: proses lain yang
+        # masih memakainya membaca lewat handle yang sudah terbuka.
+        prune_snippet_stores(self._index_dir(), previous.generation, sharded=bool(self.shards))
+
+    def close(self):
+        self.wait()
+        self._current.retire()
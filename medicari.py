@@ -0,0 +1,313 @@
+import os
+import re
+import sys
+import csv
+import html
+import json
+import time
+import logging
+import argparse
+from datetime import datetime
+from indexer import FOLDER_PATH, INDEX_PATH, IndexManager, build_speller, load_index, load_speller
+from dedup import DEDUP_MODES
+from expansion import build_cooccurrence_table, load_expansion_table, save_expansion_table
+from search import result_snippet, run_query
+
+def expansion_path(args):
+    return os.path.join(os.path.dirname(args.index), "expansion.pkl")
+
+def speller_path(args):
+    return os.path.join(os.path.dirname(args.index), "speller.pkl")
+
+def open_index(args):
+    if args.shards:
+        from sharding import ShardedIndex
+        index = ShardedIndex(args.shards, args.folder, args.dedup)
+        try:
+            loaded = index.load(os.path.join(os.path.dirname(args.index), "shard-{}.pkl"))
+        except Exception as e:
+            logging.getLogger(__name__).warning("Shard index tidak dapat dibaca: %s", e)
+            loaded = None
+        if loaded is None:
+            index.close()
+            index = None
+    else:
+        index = load_index(args.index, args.dedup)
+    if index is None:
+        print(f"Index belum ada di {args.index}. Jalankan 'python medicari.py build' terlebih dahulu.", file=sys.stderr)
+        sys.exit(1)
+    return index
+
+def require_postings(args, command):
+    if args.shards:
+        print(f"Perintah {command} membutuhkan index tanpa shard (tanpa --shards).", file=sys.stderr)
+        sys.exit(2)
+
+def print_progress(status):
+    total = status["total"]
+    if not total:
+        return
+    bar_length = 30
+    filled_length = int(bar_length * status["processed"] // total)
+    bar = '█' * filled_length + '-' * (bar_length - filled_length)
+    sys.stderr.write(f'\r[{bar}] {status["percent"]:.1f}% | Memproses: {status["current_file"][:20]:<20}')
+    sys.stderr.flush()
+
+def run_indexing(args, full):
+    manager = IndexManager(args.folder, args.index, shards=args.shards, dedup=args.dedup, spelling=False)
+    previous_generation = manager.current.generation
+    manager.start_refresh(full=full)
+    while manager.is_building():
+        print_progress(manager.status())
+        time.sleep(0.2)
+    manager.wait()
+    status = manager.status()
+    print_progress(status)
+    sys.stderr.write("\n")
+    if status["state"] == "error":
+        print(f"Indexing gagal: {status['error']}", file=sys.stderr)
+        manager.close()
+        return 1
+
+    index = manager.current
+    print(f"Generasi {previous_generation} -> {index.generation}: {index.total_docs} dokumen, {len(index.st_values)} term")
+    if index.duplicate_clusters:
+        print(f"Near-duplicate: {index.duplicate_count} dokumen dalam {len(index.duplicate_clusters)} klaster")
+    if args.expansion:
+        table = build_cooccurrence_table(index)
+        save_expansion_table(table, expansion_path(args))
+        print(f"Tabel ekspansi: {len(table)} term, {len(table.neighbor_ids)} tetangga")
+    manager.close()
+    return 0
+
+def cmd_build(args):
+    return run_indexing(args, full=True)
+
+def cmd_update(args):
+    return run_indexing(args, full=False)
+
+def cmd_inspect(args):
+    index = open_index(args)
+    try:
+        built_at = datetime.fromtimestamp(index.built_at).strftime("%Y-%m-%d %H:%M:%S")
+        print(f"Generasi      : {index.generation} (dibangun {built_at})")
+        print(f"Dokumen |D|   : {index.total_docs} ({len(index.doc_database)} file, mode duplikat {index.dedup})")
+        print(f"Kosakata      : {len(index.st_values)} term")
+        print(f"Total token   : {sum(doc['count_base'] for doc in index.doc_database)}")
+        if not args.shards:
+            print(f"Postings      : {sum(p.nbytes() for p in index.postings):,} byte terkompresi")
+            print(f"Forward index : {sum(doc['forward'].nbytes() for doc in index.doc_database):,} byte terkompresi")
+            print(f"Kosakata disk : {index.vocabulary.nbytes():,} byte front-coded")
+        if index.duplicate_clusters:
+            print(f"Near-duplicate: {index.duplicate_count} dokumen dalam {len(index.duplicate_clusters)} klaster")
+
+        if args.term:
+            term = args.term
+            if term not in index.st_values:
+                print(f"\nTerm '{term}' tidak ada di index.")
+            else:
+                print(f"\nTerm '{term}': |Dt| = {index.global_doc_freq[term]}, st = {index.st_values[term]:.4f}")
+                if not args.shards:
+                    items = index.term_postings(term).items()
+                    print(f"  total kemunculan: {sum(tf for _, tf in items)}")
+                    for doc_id, tf in sorted(items, key=lambda x: -x[1])[:args.top]:
+                        print(f"  {tf:>6}  {index.doc_database[doc_id]['filename']}")
+        else:
+            print(f"\nTop {args.top} term menurut |Dt|:")
+            print(f"{'Term (t)':<20} | {'|Dt|':<10} | {'st':<10}")
+            for term, df in index.global_doc_freq.most_common(args.top):
+                print(f"{term:<20} | {df:<10} | {index.st_values[term]:.4f}")
+
+        if args.duplicates:
+            print("\nKlaster near-duplicate:")
+            for cluster in index.duplicate_clusters:
+                print(f"  {cluster['canonical']} (kemiripan >= {cluster['similarity']:.2f})")
+                for member in cluster["members"][1:]:
+                    print(f"    - {member}")
+    finally:
+        index.retire()
+    return 0
+
+def plain_snippet(snippet):
+    text = re.sub(r"<mark[^>]*>", "[", snippet).replace("</mark>", "]")
+    return html.unescape(text)
+
+def query_options(args, index):
+    speller = None
+    if args.fuzzy:
+        # Indeks ejaan tersimpan hanya dilengkapi dengan term yang belum
+        # dikenalnya; dibangun penuh hanya jika belum pernah disimpan.
+        speller = build_speller(index, load_speller(speller_path(args)))
+    table = load_expansion_table(expansion_path(args)) if args.expand else None
+    if args.expand and table is None:
+        print("Tabel ekspansi belum ada; jalankan build/update dengan --expansion.", file=sys.stderr)
+    return speller, table
+
+def result_rows(index, outcome, with_snippet):
+    for rank, res in enumerate(outcome["results"], 1):
+        row = {
+            "rank": rank,
+            "filename": res["filename"],
+            "score": round(res["score"], 6),
+            "matches": [term for term, _ in res["matches"]]
+        }
+        if res.get("duplicates"):
+            row["duplicates"] = res["duplicates"]
+        if with_snippet:
+            row["snippet"] = plain_snippet(result_snippet(index, res, outcome["expanded_terms"]))
+        yield row
+
+def cmd_search(args):
+    index = open_index(args)
+    try:
+        speller, table = query_options(args, index)
+        outcome = run_query(index, args.query, speller, table, args.expand, args.top_k)
+        if args.json:
+            for row in result_rows(index, outcome, args.snippet):
+                print(json.dumps(row, ensure_ascii=False), flush=True)
+            return 0
+        print(f"Query Tokens: {sorted(outcome['query_tokens'])}")
+        for original, correction in outcome["corrections"].items():
+            print(f"Koreksi ejaan: {original} -> {correction}")
+        for term, boost in outcome["expanded_terms"].items():
+            print(f"Ekspansi: {term} (x{boost:.2f})")
+        if not outcome["results"]:
+            print("Tidak ada dokumen yang relevan.")
+            return 0
+        print(f"{'RANK':<5} {'SCORE':<10} {'FILENAME'}")
+        for row in result_rows(index, outcome, args.snippet):
+            print(f"{row['rank']:<5} {row['score']:<10.4f} {row['filename']}", flush=True)
+            if row.get("duplicates"):
+                print(f"      duplikat: {', '.join(row['duplicates'])}")
+            if row.get("snippet"):
+                print(f"      {row['snippet']}", flush=True)
+    finally:
+        index.retire()
+    return 0
+
+def cmd_batch_search(args):
+    source = args.input
+    index = open_index(args)
+    try:
+        speller, table = query_options(args, index)
+        for line in source:
+            query = line.strip()
+            if not query:
+                continue
+            outcome = run_query(index, query, speller, table, args.expand, args.top_k)
+            record = {
+                "query": query,
+                "query_tokens": sorted(outcome["query_tokens"]),
+                "corrections": outcome["corrections"],
+                "expanded_terms": outcome["expanded_terms"],
+                "results": list(result_rows(index, outcome, args.snippet))
+            }
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        index.retire()
+    return 0
+
+def export_rows(index, per_document):
+    terms = list(index.vocabulary)
+    if per_document:
+        for doc_id, doc in enumerate(index.doc_database):
+            for term_id, tf in doc["forward"].items():
+                yield {"filename": doc["filename"], "term": terms[term_id], "tf": tf}
+    else:
+        for term, postings in zip(terms, index.postings):
+            yield {
+                "term": term,
+                "df": index.global_doc_freq[term],
+                "cf": sum(tf for _, tf in postings.items()),
+                "st": round(index.st_values[term], 6)
+            }
+
+def cmd_export(args):
+    require_postings(args, "export")
+    index = open_index(args)
+    output = sys.stdout
+    try:
+        if args.output != "-":
+            try:
+                output = open(args.output, "w", encoding="utf-8", newline="")
+            except OSError as e:
+                print(f"Tidak dapat menulis {args.output}: {e}", file=sys.stderr)
+                return 1
+        rows = export_rows(index, args.per_document)
+        if args.format == "jsonl":
+            for row in rows:
+                output.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            fields = ["filename", "term", "tf"] if args.per_document else ["term", "df", "cf", "st"]
+            writer = csv.DictWriter(output, fieldnames=fields)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        index.retire()
+    return 0
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--folder", default=FOLDER_PATH, help="folder dokumen (default: %(default)s)")
+    common.add_argument("--index", default=INDEX_PATH, help="file index (default: %(default)s)")
+    common.add_argument("--shards", type=int, default=int(os.environ.get("MEDICARI_SHARDS", "0")),
+                        help="jumlah proses shard, 0 = tanpa shard")
+    common.add_argument("--dedup", choices=DEDUP_MODES, default=os.environ.get("MEDICARI_DEDUP", "collapse"),
+                        help="penanganan near-duplicate (default: %(default)s)")
+
+    query = argparse.ArgumentParser(add_help=False)
+    query.add_argument("-k", "--top-k", type=int, default=None, help="jumlah hasil maksimum")
+    query.add_argument("--expand", action="store_true", help="perluas query dengan istilah terkait")
+    query.add_argument("--fuzzy", action="store_true", help="koreksi term query yang salah ketik")
+    query.add_argument("--snippet", action="store_true", help="tampilkan cuplikan teks")
+
+    parser = argparse.ArgumentParser(prog="medicari", description="Temu balik dokumen JournalMedis dari command line")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("build", parents=[common], help="bangun ulang index dari semua dokumen")
+    p.add_argument("--expansion", action="store_true", help="bangun juga tabel ekspansi query")
+    p.set_defaults(func=cmd_build)
+
+    p = sub.add_parser("update", parents=[common], help="perbarui index, hanya dokumen yang berubah")
+    p.add_argument("--expansion", action="store_true", help="bangun juga tabel ekspansi query")
+    p.set_defaults(func=cmd_update)
+
+    p = sub.add_parser("inspect", parents=[common], help="statistik kosakata dan term teratas")
+    p.add_argument("--top", type=int, default=20, help="jumlah term/dokumen yang ditampilkan")
+    p.add_argument("--term", help="detail satu term (sudah di-stem)")
+    p.add_argument("--duplicates", action="store_true", help="tampilkan klaster near-duplicate")
+    p.set_defaults(func=cmd_inspect)
+
+    p = sub.add_parser("search", parents=[common, query], help="cari dokumen untuk satu query")
+    p.add_argument("query")
+    p.add_argument("--json", action="store_true", help="keluaran JSON per baris")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("batch-search", parents=[common, query], help="cari banyak query, satu per baris (JSONL)")
+    p.add_argument("input", type=argparse.FileType("r", encoding="utf-8"),
+                   help="file berisi query per baris, atau - untuk stdin")
+    p.set_defaults(func=cmd_batch_search)
+
+    p = sub.add_parser("export", parents=[common], help="ekspor frekuensi term ke CSV/JSONL")
+    p.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    p.add_argument("--per-document", action="store_true", help="satu baris per (dokumen, term) alih-alih per term")
+    p.add_argument("-o", "--output", default="-", help="file keluaran, - untuk stdout")
+    p.set_defaults(func=cmd_export)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        # Keluaran dipotong (mis. "| head"); bukan kesalahan.
+        sys.stderr.close()
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
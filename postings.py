@@ -0,0 +1,219 @@
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+
+BLOCK_SIZE = 128
+BUCKET_SIZE = 16
+
+def encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def decode_varint(data, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+def encode_varints(values):
+    out = bytearray()
+    for value in values:
+        encode_varint(value, out)
+    return bytes(out)
+
+def decode_varints(data):
+    # Jalur cepat: jika tidak ada byte lanjutan, setiap byte adalah satu angka.
+    if not data or max(data) < 0x80:
+        return list(data)
+    values = []
+    append = values.append
+    result = 0
+    shift = 0
+    for byte in data:
+        if byte < 0x80:
+            append(result | (byte << shift))
+            result = 0
+            shift = 0
+        else:
+            result |= (byte & 0x7F) << shift
+            shift += 7
+    return values
+
+class CompressedPostings:
+    # Daftar doc id terurut disimpan sebagai selisih (delta) berformat varint,
+    # diselingi term frequency jika ada. Setiap BLOCK_SIZE entri dicatat skip
+    # pointer (doc id terakhir blok + offset byte) sehingga intersect cukup
+    # mendekode blok yang mungkin berisi doc id yang dicari.
+    __slots__ = ("data", "count", "has_tf", "block_last", "block_offset")
+
+    def __init__(self, doc_ids, tfs=None):
+        out = bytearray()
+        self.count = len(doc_ids)
+        self.has_tf = tfs is not None
+        self.block_last = array("I")
+        self.block_offset = array("I")
+        previous = 0
+        for i, doc_id in enumerate(doc_ids):
+            if i and i % BLOCK_SIZE == 0:
+                self.block_last.append(previous)
+                self.block_offset.append(len(out))
+            if doc_id < previous:
+                raise ValueError("doc_ids harus terurut naik")
+            encode_varint(doc_id - previous, out)
+            if self.has_tf:
+                encode_varint(tfs[i], out)
+            previous = doc_id
+        self.data = bytes(out)
+
+    def __len__(self):
+        return self.count
+
+    def nbytes(self):
+        return len(self.data) + self.block_last.itemsize * (len(self.block_last) + len(self.block_offset))
+
+    def _decode(self, data, base):
+        values = decode_varints(data)
+        gaps = values[::2] if self.has_tf else values
+        doc_ids = list(accumulate(gaps, initial=base))[1:]
+        return doc_ids, values
+
+    def doc_ids(self):
+        return self._decode(self.data, 0)[0]
+
+    def items(self):
+        doc_ids, values = self._decode(self.data, 0)
+        if not self.has_tf:
+            return [(doc_id, 1) for doc_id in doc_ids]
+        return list(zip(doc_ids, values[1::2]))
+
+    def block_doc_ids(self, block):
+        start = self.block_offset[block - 1] if block else 0
+        end = self.block_offset[block] if block < len(self.block_offset) else len(self.data)
+        base = self.block_last[block - 1] if block else 0
+        return self._decode(self.data[start:end], base)[0]
+
+    def filter(self, sorted_targets):
+        # Untuk setiap target, skip pointer menunjuk satu-satunya blok yang
+        # mungkin memuatnya; blok lain tidak pernah didekode.
+        result = []
+        current_block = -1
+        block_ids = []
+        for target in sorted_targets:
+            block = bisect_left(self.block_last, target)
+            if block != current_block:
+                block_ids = self.block_doc_ids(block)
+                current_block = block
+            i = bisect_left(block_ids, target)
+            if i < len(block_ids) and block_ids[i] == target:
+                result.append(target)
+        return result
+
+def intersect(*postings_lists):
+    if not postings_lists:
+        return []
+    ordered = sorted(postings_lists, key=len)
+    result = ordered[0].doc_ids()
+    for postings in ordered[1:]:
+        if not result:
+            break
+        result = postings.filter(result)
+    return result
+
+class FrontCodedVocabulary:
+    # Kosakata terurut disimpan per bucket: term pertama utuh, term berikutnya
+    # hanya panjang prefix bersama dengan term sebelumnya ditambah sisa suffix.
+    __slots__ = ("data", "count", "bucket_size", "bucket_offset")
+
+    def __init__(self, sorted_terms, bucket_size=BUCKET_SIZE):
+        out = bytearray()
+        self.count = len(sorted_terms)
+        self.bucket_size = bucket_size
+        self.bucket_offset = array("I")
+        previous = b""
+        for i, term in enumerate(sorted_terms):
+            encoded = term.encode("utf-8")
+            if i and encoded <= previous:
+                raise ValueError("kosakata harus terurut dan unik")
+            if i % bucket_size == 0:
+                self.bucket_offset.append(len(out))
+                encode_varint(len(encoded), out)
+                out += encoded
+            else:
+                prefix = 0
+                limit = min(len(previous), len(encoded))
+                while prefix < limit and previous[prefix] == encoded[prefix]:
+                    prefix += 1
+                encode_varint(prefix, out)
+                encode_varint(len(encoded) - prefix, out)
+                out += encoded[prefix:]
+            previous = encoded
+        self.data = bytes(out)
+
+    def __len__(self):
+        return self.count
+
+    def nbytes(self):
+        return len(self.data) + self.bucket_offset.itemsize * len(self.bucket_offset)
+
+    def _first(self, bucket):
+        length, pos = decode_varint(self.data, self.bucket_offset[bucket])
+        return self.data[pos:pos + length]
+
+    def _bucket(self, bucket):
+        data = self.data
+        pos = self.bucket_offset[bucket]
+        end = min(self.bucket_size, self.count - bucket * self.bucket_size)
+        length, pos = decode_varint(data, pos)
+        term = data[pos:pos + length]
+        pos += length
+        terms = [term]
+        for _ in range(end - 1):
+            prefix, pos = decode_varint(data, pos)
+            length, pos = decode_varint(data, pos)
+            term = term[:prefix] + data[pos:pos + length]
+            pos += length
+            terms.append(term)
+        return terms
+
+    def __getitem__(self, term_id):
+        if term_id < 0:
+            term_id += self.count
+        if not 0 <= term_id < self.count:
+            raise IndexError(term_id)
+        bucket, offset = divmod(term_id, self.bucket_size)
+        return self._bucket(bucket)[offset].decode("utf-8")
+
+    def __iter__(self):
+        for bucket in range(len(self.bucket_offset)):
+            for term in self._bucket(bucket):
+                yield term.decode("utf-8")
+
+    def index(self, term):
+        if not self.count:
+            return -1
+        encoded = term.encode("utf-8")
+        lo, hi = 0, len(self.bucket_offset)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._first(mid) <= encoded:
+                lo = mid + 1
+            else:
+                hi = mid
+        bucket = lo - 1
+        if bucket < 0:
+            return -1
+        terms = self._bucket(bucket)
+        i = bisect_left(terms, encoded)
+        if i < len(terms) and terms[i] == encoded:
+            return bucket * self.bucket_size + i
+        return -1
+
+    def __contains__(self, term):
+        return self.index(term) >= 0
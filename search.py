@@ -0,0 +1,44 @@
+from indexer import bim_weight, get_preprocessing_steps
+from expansion import expand_query
+from snippets import make_snippet
+
+def run_query(index, query, speller=None, expansion_table=None, expand=False, top_k=None):
+    # Alur query yang sama untuk web dan CLI: preprocessing, koreksi ejaan
+    # term yang tidak dikenal, ekspansi opsional, lalu skoring BIM.
+    query_tokens = set(get_preprocessing_steps(query)['stemmed'])
+
+    corrections = {}
+    if speller is not None:
+        for term in sorted(query_tokens):
+            if term not in index.st_values:
+                correction = speller.correct(term, index.global_doc_freq)
+                if correction:
+                    corrections[term] = correction
+        query_tokens = (query_tokens - set(corrections)) | set(corrections.values())
+
+    boosts = None
+    expanded_terms = {}
+    if expand:
+        boosts = expand_query(query_tokens, expansion_table, index.st_values)
+        expanded_terms = {term: boost for term, boost in boosts.items() if term not in query_tokens}
+
+    results = index.search(boosts if boosts is not None else query_tokens, top_k=top_k, boosts=boosts)
+    return {
+        "query": query,
+        "query_tokens": query_tokens,
+        "corrections": corrections,
+        "expanded_terms": expanded_terms,
+        "results": results
+    }
+
+def result_snippet(index, res, expanded_terms):
+    doc = index.doc_by_filename.get(res["filename"])
+    if doc is None:
+        return ""
+    # Term yang sangat umum (bobot BIM negatif) tetap disorot,
+    # tetapi nyaris tidak ikut menentukan passage terbaik.
+    weights = {}
+    for term, st in res["matches"]:
+        weight = bim_weight(st) * expanded_terms.get(term, 1.0)
+        weights[term] = max(weight, 0.01)
+    return make_snippet(doc.get("snippet_ref"), weights)
@@ -0,0 +1,432 @@
+import os
+import zlib
+import time
+import heapq
+import queue
+import logging
+import itertools
+import threading
+import multiprocessing
+from collections import Counter
+from postings import CompressedPostings
+from dedup import collapse_results, find_duplicate_clusters
+from snippets import SnippetWriter, open_snippet_stores, snippet_path
+from indexer import FOLDER_PATH, INDEX_DIR, IndexGeneration, atomic_pickle, compute_st_values, bim_weight, file_signature, index_document, list_files, load_pickle, store_snippet
+
+SHARD_PATH = os.path.join(INDEX_DIR, "shard-{}.pkl")
+SHARD_FORMAT = 7
+
+class ShardError(Exception):
+    pass
+
+def shard_of(filename, num_shards):
+    # Pembagian berdasarkan nama file (bukan urutan) agar dokumen tetap di
+    # shard yang sama antar generasi dan bisa dipakai ulang saat update.
+    return zlib.crc32(filename.encode("utf-8")) % num_shards
+
+class _Shard:
+    # Berjalan di dalam proses worker; hanya menyimpan dokumen milik shard ini.
+    def __init__(self, shard_id, num_shards, folder):
+        self.shard_id = shard_id
+        self.num_shards = num_shards
+        self.folder = folder
+        self.generation = 0
+        self.built_at = 0.0
+        self.docs = {}
+        self.postings = {}
+        self.doc_freq = Counter()
+
+    def _add(self, position, doc):
+        self.docs[position] = {
+            "filename": doc["filename"],
+            "count_base": doc["count_base"],
+            "unique_terms": len(doc["freq"]),
+            "minhash": doc["minhash"],
+            "snippet_ref": doc["snippet_ref"],
+            "signature": doc["signature"]
+        }
+        for token, tf in doc["freq"].items():
+            self.doc_freq[token] += 1
+            self.postings.setdefault(token, []).append((position, tf))
+
+    def _read(self, path):
+        payload = load_pickle(path, SHARD_FORMAT, "Shard")
+        if payload is None:
+            raise ShardError(f"Shard {path} tidak dapat dibaca atau formatnya tidak dikenali")
+        if payload.get("num_shards") != self.num_shards:
+            raise ShardError(f"Shard {path} dibuat untuk {payload.get('num_shards')} shard, bukan {self.num_shards}")
+        return payload
+
+    def _previous_documents(self, path):
+        # Dokumen generasi sebelumnya per nama file, beserta frekuensi term
+        # yang direkonstruksi dari postings, seperti raw_document pada
+        # index tanpa shard.
+        if not path or not os.path.exists(path):
+            return {}
+        try:
+            payload = self._read(path)
+        except Exception as e:
+            logging.getLogger(__name__).warning("Shard sebelumnya tidak dipakai ulang: %s", e)
+            return {}
+        freqs = {position: Counter() for position in payload["docs"]}
+        for term, postings in payload["postings"].items():
+            for position, tf in postings.items():
+                freqs[position][term] = tf
+        return {doc["filename"]: (doc, freqs[position]) for position, doc in payload["docs"].items()}
+
+    def build(self, generation, files, snippet_file, previous_path, progress):
+        self.generation = generation
+        previous = self._previous_documents(previous_path)
+        writer = SnippetWriter(snippet_file) if snippet_file else None
+        try:
+            for position, filename in files:
+                progress(filename)
+                reused = previous.get(filename)
+                previous_ref = None
+                if reused is not None and reused[0]["signature"] == file_signature(filename, self.folder):
+                    doc = dict(reused[0], freq=reused[1])
+                    previous_ref = doc.pop("snippet_ref")
+                else:
+                    doc = index_document(filename, self.folder)
+                if doc is not None:
+                    self._add(position, store_snippet(doc, writer, previous_ref))
+        except Exception:
+            if writer is not None:
+                writer.abort()
+            raise
+        if writer is not None:
+            writer.close()
+        self.built_at = time.time()
+        self.postings = {
+            term: CompressedPostings([position for position, _ in items], [tf for _, tf in items])
+            for term, items in self.postings.items()
+        }
+        return self.stats()
+
+    def load(self, path):
+        payload = self._read(path)
+        self.generation = payload["generation"]
+        self.built_at = payload["built_at"]
+        self.docs = payload["docs"]
+        self.postings = payload["postings"]
+        self.doc_freq = Counter({term: len(ids) for term, ids in self.postings.items()})
+        return self.stats()
+
+    def save(self, path):
+        atomic_pickle(path, {
+            "format": SHARD_FORMAT,
+            "num_shards": self.num_shards,
+            "generation": self.generation,
+            "built_at": self.built_at,
+            "docs": self.docs,
+            "postings": self.postings
+        })
+        return True
+
+    def stats(self):
+        return {
+            "generation": self.generation,
+            "built_at": self.built_at,
+            "docs": self.docs,
+            "doc_freq": dict(self.doc_freq)
+        }
+
+    def cluster_term_counts(self, cluster_of):
+        counts = {}
+        for term, postings in self.postings.items():
+            for position in postings.doc_ids():
+                cluster_id = cluster_of.get(position)
+                if cluster_id is not None:
+                    cluster_counts = counts.setdefault(cluster_id, Counter())
+                    cluster_counts[term] += 1
+        return counts
+
+    def top_terms(self, eligible, limit):
+        items = {}
+        for term, postings in self.postings.items():
+            if term in eligible:
+                for position, tf in postings.items():
+                    items.setdefault(position, []).append((term, tf))
+        top = {}
+        for position, doc_items in items.items():
+            doc_items.sort(key=lambda x: (-x[1], x[0]))
+            top[position] = [term for term, _ in doc_items[:limit]]
+        return top
+
+    def search(self, weighted_terms, top_k):
+        scores = {}
+        matches = {}
+        for term, st, weight in weighted_terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            for position in postings.doc_ids():
+                scores[position] = scores.get(position, 0) + weight
+                matches.setdefault(position, []).append((term, st))
+        hits = [(position, score) for position, score in scores.items() if score > 0]
+        hits.sort(key=lambda x: (-x[1], x[0]))
+        if top_k is not None:
+            hits = hits[:top_k]
+        return [(position, score, self.docs[position]["filename"], matches[position]) for position, score in hits]
+
+def _shard_worker(conn, shard_id, num_shards, folder):
+    # Setiap pesan membawa id permintaan; balasan (termasuk progress)
+    # menyertakan id yang sama agar koordinator bisa meneruskannya ke
+    # thread yang menunggu.
+    shard = _Shard(shard_id, num_shards, folder)
+    while True:
+        try:
+            request_id, command, args = conn.recv()
+        except EOFError:
+            break
+        if command == "stop":
+            break
+        try:
+            if command == "build":
+                result = shard.build(args[0], args[1], args[2], args[3],
+                                     lambda filename: conn.send((request_id, "progress", filename)))
+            elif command == "load":
+                result = shard.load(args[0])
+            elif command == "save":
+                result = shard.save(args[0])
+            elif command == "cluster_terms":
+                result = shard.cluster_term_counts(args[0])
+            elif command == "top_terms":
+                result = shard.top_terms(args[0], args[1])
+            elif command == "search":
+                result = shard.search(args[0], args[1])
+            else:
+                raise ShardError(f"Perintah tidak dikenal: {command}")
+            conn.send((request_id, "ok", result))
+        except Exception as e:
+            conn.send((request_id, "error", f"{type(e).__name__}: {e}"))
+    conn.close()
+
+class ShardedIndex(IndexGeneration):
+    # Koordinator: dokumen dibagi menurut nama file ke N proses worker. Frekuensi
+    # dokumen tiap shard digabung di sini sehingga st_values identik dengan
+    # index tanpa shard, lalu setiap query disebar ke semua shard dan
+    # hasil top-k masing-masing shard digabung kembali. Beberapa query boleh
+    # berjalan bersamaan: balasan shard diteruskan menurut id permintaan,
+    # walaupun tiap proses shard tetap mengerjakan perintahnya satu per satu.
+    def __init__(self, num_shards, folder=FOLDER_PATH, dedup="off"):
+        if num_shards < 1:
+            raise ValueError("num_shards minimal 1")
+        super().__init__(0, [], dedup=dedup)
+        self.num_shards = num_shards
+        self.folder = folder
+        self._connections = []
+        self._processes = []
+        self._send_locks = []
+        self._readers = []
+        self._request_ids = itertools.count()
+        self._requests = {}
+        self._requests_lock = threading.Lock()
+        self._stopped = set()
+        # Worker dibuat dengan "spawn", bukan fork: proses web bersifat
+        # multithread dan memegang handle file snippet serta lock milik
+        # thread lain, yang tidak boleh ikut tersalin ke worker.
+        context = multiprocessing.get_context("spawn")
+        for shard_id in range(num_shards):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_shard_worker,
+                args=(child_conn, shard_id, num_shards, folder),
+                name=f"index-shard-{shard_id}",
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+            self._send_locks.append(threading.Lock())
+            reader = threading.Thread(target=self._read_replies, args=(shard_id, parent_conn),
+                                      name=f"index-shard-{shard_id}-reader", daemon=True)
+            reader.start()
+            self._readers.append(reader)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_replies(self, shard_id, conn):
+        # Satu thread per shard membaca semua balasan dan meneruskannya ke
+        # antrean permintaan yang sesuai.
+        while True:
+            try:
+                request_id, status, payload = conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._requests_lock:
+                replies = self._requests.get(request_id)
+            if replies is not None:
+                replies.put((shard_id, status, payload))
+        with self._requests_lock:
+            self._stopped.add(shard_id)
+            waiting = list(self._requests.values())
+        for replies in waiting:
+            replies.put((shard_id, "stopped", None))
+
+    def _call(self, messages, progress=None):
+        # messages: satu (perintah, argumen) per shard. Mengembalikan hasil
+        # per shard setelah semua shard membalas.
+        request_id = next(self._request_ids)
+        replies = queue.Queue()
+        with self._requests_lock:
+            self._requests[request_id] = replies
+            stopped = set(self._stopped)
+        results = [None] * self.num_shards
+        pending = set(range(self.num_shards))
+        errors = []
+        try:
+            for shard_id, (command, args) in enumerate(messages):
+                if shard_id in stopped:
+                    pending.discard(shard_id)
+                    errors.append(f"shard {shard_id} berhenti")
+                    continue
+                try:
+                    with self._send_locks[shard_id]:
+                        self._connections[shard_id].send((request_id, command, args))
+                except OSError:
+                    pending.discard(shard_id)
+                    errors.append(f"shard {shard_id} berhenti")
+            while pending:
+                shard_id, status, payload = replies.get()
+                if shard_id not in pending:
+                    continue
+                if status == "progress":
+                    if progress:
+                        progress(payload)
+                    continue
+                pending.discard(shard_id)
+                if status == "error":
+                    errors.append(f"shard {shard_id}: {payload}")
+                elif status == "stopped":
+                    errors.append(f"shard {shard_id} berhenti")
+                else:
+                    results[shard_id] = payload
+        finally:
+            with self._requests_lock:
+                del self._requests[request_id]
+        if errors:
+            raise ShardError("; ".join(errors))
+        return results
+
+    def _merge_stats(self, stats):
+        generations = set(s["generation"] for s in stats)
+        if len(generations) != 1:
+            raise ShardError("Generasi shard tidak konsisten")
+        self.generation = generations.pop()
+        # Generasi selesai dibangun saat shard terakhir selesai.
+        self.built_at = max(s["built_at"] for s in stats)
+        docs = {}
+        self.global_doc_freq = Counter()
+        for s in stats:
+            docs.update(s["docs"])
+            self.global_doc_freq.update(s["doc_freq"])
+        self.doc_database = [docs[position] for position in sorted(docs)]
+        self.doc_by_filename = {doc["filename"]: doc for doc in self.doc_database}
+        self.snippet_stores = open_snippet_stores(doc["snippet_ref"] for doc in self.doc_database)
+        self.total_docs = len(self.doc_database)
+
+        positions = {doc["filename"]: position for position, doc in docs.items()}
+        self.set_duplicates(self.dedup, find_duplicate_clusters(
+            [(doc["filename"], doc["minhash"], doc["count_base"]) for doc in self.doc_database]
+        ))
+        if self.dedup == "exclude" and self.duplicate_clusters:
+            cluster_of = {positions[filename]: cluster_id for filename, cluster_id in self.cluster_of.items()}
+            cluster_term_counts = [Counter() for _ in self.duplicate_clusters]
+            for shard_counts in self._call([("cluster_terms", (cluster_of,))] * self.num_shards):
+                for cluster_id, counts in shard_counts.items():
+                    cluster_term_counts[cluster_id].update(counts)
+            self.exclude_duplicates(cluster_term_counts)
+        self.st_values = compute_st_values(self.global_doc_freq, self.total_docs)
+
+    def build(self, generation, progress=None, snippet_dir=None, previous_pattern=None):
+        # previous_pattern: pola path shard generasi sebelumnya; dokumen yang
+        # signature-nya tidak berubah dipakai ulang tanpa ekstraksi ulang.
+        files = list_files(self.folder)
+        parts = [[] for _ in range(self.num_shards)]
+        for position, filename in enumerate(files):
+            parts[shard_of(filename, self.num_shards)].append((position, filename))
+
+        done = [0]
+        def on_progress(filename):
+            done[0] += 1
+            if progress:
+                progress(done[0], len(files), filename)
+
+        self._merge_stats(self._call([
+            ("build", (generation, part,
+                       snippet_path(snippet_dir, generation, f"-{shard_id}") if snippet_dir else None,
+                       previous_pattern.format(shard_id) if previous_pattern else None))
+            for shard_id, part in enumerate(parts)
+        ], on_progress))
+        return self
+
+    def save(self, path_pattern=SHARD_PATH):
+        self._call([("save", (path_pattern.format(i),)) for i in range(self.num_shards)])
+
+    def load(self, path_pattern=SHARD_PATH):
+        paths = [path_pattern.format(i) for i in range(self.num_shards)]
+        if not all(os.path.exists(p) for p in paths):
+            return None
+        self._merge_stats(self._call([("load", (p,)) for p in paths]))
+        return self
+
+    def top_document_terms(self, eligible, limit):
+        shard_tops = self._call([("top_terms", (eligible, limit))] * self.num_shards)
+        top = {}
+        for shard_top in shard_tops:
+            top.update(shard_top)
+        return [top[position] for position in sorted(top)]
+
+    def search(self, query_tokens, top_k=None, boosts=None):
+        weighted_terms = []
+        for term in query_tokens:
+            if term in self.st_values:
+                st = self.st_values[term]
+                weight = bim_weight(st)
+                if boosts is not None:
+                    weight *= boosts.get(term, 1.0)
+                weighted_terms.append((term, st, weight))
+        if not weighted_terms:
+            return []
+
+        # Saat hasil dilipat, setiap shard perlu mengirim cadangan sebanyak
+        # jumlah dokumen duplikat agar top-k setelah pelipatan tetap penuh.
+        shard_top_k = top_k
+        if top_k is not None and self.dedup != "off":
+            shard_top_k = top_k + self.duplicate_count
+
+        shard_hits = self._call([("search", (weighted_terms, shard_top_k))] * self.num_shards)
+
+        hits = heapq.merge(*shard_hits, key=lambda x: (-x[1], x[0]))
+        results = [{"filename": filename, "score": score, "matches": matches} for _, score, filename, matches in hits]
+        if self.dedup != "off":
+            results = collapse_results(results, self.cluster_of)
+        if top_k is not None:
+            results = results[:top_k]
+        return results
+
+    def close(self):
+        if not super().close():
+            return False
+        for conn, send_lock in zip(self._connections, self._send_locks):
+            try:
+                with send_lock:
+                    conn.send((None, "stop", None))
+            except OSError:
+                pass
+        for process in self._processes:
+            process.join(5)
+            if process.is_alive():
+                logging.getLogger(__name__).warning("Shard %s tidak berhenti, dihentikan paksa", process.name)
+                process.terminate()
+        for reader in self._readers:
+            reader.join(5)
+        for conn in self._connections:
+            conn.close()
+        return True
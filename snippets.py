@@ -0,0 +1,217 @@
+import os
+import re
+import glob
+import html
+import zlib
+import uuid
+import pickle
+import logging
+import threading
+from bisect import bisect_left
+
+MAX_PASSAGE_CHARS = 320
+SNIPPET_FILE = "snippets-{generation}-{token}{suffix}.bin"
+
+_STORE_NAME = re.compile(r"snippets-(\d+)(?:-[0-9a-f]{8})?(-\d+)?\.bin$")
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+def split_passages(text, max_chars=MAX_PASSAGE_CHARS, token_spans=()):
+    # Passage = kalimat; kalimat yang terlalu panjang (umum pada hasil
+    # ekstraksi PDF tanpa tanda baca) dipotong lagi di batas spasi. Deretan
+    # tanpa spasi dipotong paksa, tetapi tidak di tengah token: potongan
+    # digeser ke akhir token yang terkena.
+    token_starts = [token_start for _, token_start, _ in token_spans]
+    passages = []
+    start = 0
+    boundaries = [m.start() for m in _SENTENCE_END.finditer(text)] + [len(text)]
+    for end in boundaries:
+        while start < end and text[start].isspace():
+            start += 1
+        while end - start > max_chars:
+            cut = text.rfind(" ", start, start + max_chars)
+            if cut <= start:
+                cut = start + max_chars
+                i = bisect_left(token_starts, cut) - 1
+                if i >= 0 and token_spans[i][2] > cut:
+                    cut = min(token_spans[i][2], end)
+            passages.append((start, cut))
+            start = cut
+            while start < end and text[start].isspace():
+                start += 1
+        if start < end:
+            passages.append((start, end))
+        start = end
+    return passages
+
+def build_snippet_blob(text, token_spans):
+    passages = []
+    spans = iter(token_spans)
+    span = next(spans, None)
+    for start, end in split_passages(text, token_spans=token_spans):
+        tokens = []
+        while span is not None and span[1] < end:
+            if span[1] >= start:
+                tokens.append(span)
+            span = next(spans, None)
+        if tokens:
+            passages.append((start, end, tokens))
+    payload = {"text": text, "passages": passages}
+    return zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+
+class SnippetWriter:
+    # File append-only berisi blob terkompresi per dokumen; dokumen cukup
+    # menyimpan (path, offset, panjang) untuk membacanya kembali.
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            # Beberapa shard bisa membuat folder yang sama secara bersamaan.
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.file = open(self.tmp_path, "wb")
+
+    def write(self, blob):
+        offset = self.file.tell()
+        self.file.write(blob)
+        return (self.path, offset, len(blob))
+
+    def close(self):
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+class SnippetStore:
+    # Handle terbuka ke satu file snippet, dipakai bersama oleh semua
+    # generasi di proses ini yang merujuknya. Selama masih terbuka, isinya
+    # tetap terbaca walaupun file sudah dihapus oleh proses lain yang
+    # berbagi folder index.
+    def __init__(self, path):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        self.refs = 0
+
+    def read(self, offset, length):
+        # pread tidak memakai posisi file bersama, jadi aman dipanggil dari
+        # banyak thread sekaligus tanpa lock.
+        if hasattr(os, "pread"):
+            return os.pread(self.fd, length, offset)
+        # Windows tidak punya pread, tetapi di sana file yang masih terbuka
+        # juga tidak bisa dihapus, sehingga cukup dibuka ulang.
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def close(self):
+        os.close(self.fd)
+
+_open_stores = {}
+_open_stores_lock = threading.Lock()
+
+def open_snippet_stores(refs):
+    paths = sorted({ref[0] for ref in refs if ref is not None})
+    stores = []
+    with _open_stores_lock:
+        for path in paths:
+            store = _open_stores.get(path)
+            if store is None:
+                try:
+                    store = SnippetStore(path)
+                except OSError as e:
+                    logging.getLogger(__name__).warning("Snippet %s tidak dapat dibuka: %s", path, e)
+                    continue
+                _open_stores[path] = store
+            store.refs += 1
+            stores.append(store)
+    return stores
+
+def close_snippet_stores(stores):
+    with _open_stores_lock:
+        for store in stores:
+            store.refs -= 1
+            if store.refs == 0:
+                del _open_stores[store.path]
+                store.close()
+
+def read_snippet_blob(ref):
+    path, offset, length = ref
+    store = _open_stores.get(path)
+    if store is not None:
+        return store.read(offset, length)
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(length)
+
+def load_snippet_data(ref):
+    if ref is None:
+        return None
+    try:
+        return pickle.loads(zlib.decompress(read_snippet_blob(ref)))
+    except (OSError, zlib.error, pickle.UnpicklingError) as e:
+        logging.getLogger(__name__).warning("Snippet %s tidak dapat dibaca: %s", ref[0], e)
+        return None
+
+def best_passage(data, weights):
+    best = None
+    for passage in data["passages"]:
+        matched = set()
+        hits = 0
+        for stem, _, _ in passage[2]:
+            if stem in weights:
+                matched.add(stem)
+                hits += 1
+        if not matched:
+            continue
+        score = sum(weights[stem] for stem in matched) + 0.01 * hits
+        if best is None or score > best[0]:
+            best = (score, passage)
+    return best[1] if best else None
+
+def render_passage(text, passage, weights):
+    start, end, tokens = passage
+    parts = []
+    if start > 0:
+        parts.append("&hellip; ")
+    cursor = start
+    for stem, token_start, token_end in tokens:
+        if stem not in weights:
+            continue
+        parts.append(html.escape(text[cursor:token_start]))
+        parts.append(f"<mark class='bg-yellow-100 text-slate-800 font-semibold rounded px-0.5'>{html.escape(text[token_start:token_end])}</mark>")
+        cursor = token_end
+    parts.append(html.escape(text[cursor:end]))
+    if end < len(text.rstrip()):
+        parts.append(" &hellip;")
+    return "".join(parts)
+
+def make_snippet(ref, weights):
+    data = load_snippet_data(ref)
+    if data is None:
+        return ""
+    passage = best_passage(data, weights)
+    if passage is None:
+        return ""
+    return render_passage(data["text"], passage, weights)
+
+def snippet_path(directory, generation, suffix=""):
+    # Nomor generasi saja tidak unik: web app dan CLI bisa membangun
+    # generasi bernomor sama dari folder index yang sama.
+    token = uuid.uuid4().hex[:8]
+    return os.path.join(directory, SNIPPET_FILE.format(generation=generation, token=token, suffix=suffix))
+
+def prune_snippet_stores(directory, keep_from_generation, sharded=False):
+    # Hanya file milik mode yang sama (dengan/tanpa shard) yang dihapus;
+    # nomor generasi kedua mode berjalan sendiri-sendiri.
+    for path in glob.glob(os.path.join(directory, "snippets-*.bin")):
+        match = _STORE_NAME.match(os.path.basename(path))
+        if match is None or bool(match.group(2)) != sharded:
+            continue
+        if int(match.group(1)) < keep_from_generation:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,206 @@
+import zlib
+from array import array
+from itertools import accumulate
+
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+MIN_TERM_LENGTH = 4
+
+DICTIONARY = 1
+INDEXED = 2
+
+def edit_distance(a, b, max_distance):
+    # Damerau-Levenshtein (optimal string alignment) dengan penghentian
+    # dini begitu seluruh baris sudah melewati max_distance.
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+class _FrozenDeletes:
+    # Kamus penghapusan read-only yang ringkas untuk disimpan. Varian tidak
+    # ikut disimpan: kata didaftarkan di bucket crc32(varian) % jumlah
+    # bucket, dengan kata bucket ke-i di word_ids[offsets[i]:offsets[i + 1]].
+    # Tabrakan hash hanya menambah kandidat yang tetap diverifikasi dengan
+    # edit distance. Dipakai langsung tanpa dibongkar menjadi dict, sehingga
+    # memuatnya hanya butuh beberapa milidetik.
+    def __init__(self, words, variants):
+        word_list = sorted(words)
+        self.text = "\n".join(word_list)
+        self.starts = array("I")
+        position = 0
+        for word in word_list:
+            self.starts.append(position)
+            position += len(word) + 1
+        self.starts.append(position)
+        self.flags = array("B", (words[word] for word in word_list))
+
+        pairs = []
+        for word_id, word in enumerate(word_list):
+            for variant in variants(word):
+                pairs.append((zlib.crc32(variant.encode("utf-8")), word_id))
+        self.num_buckets = max(len(pairs), 1)
+        counts = [0] * (self.num_buckets + 1)
+        for h, _ in pairs:
+            counts[h % self.num_buckets + 1] += 1
+        self.offsets = array("I", accumulate(counts))
+        cursor = list(self.offsets)
+        word_ids = [0] * len(pairs)
+        for h, word_id in pairs:
+            bucket = h % self.num_buckets
+            word_ids[cursor[bucket]] = word_id
+            cursor[bucket] += 1
+        self.word_ids = array("I", word_ids)
+
+    def __len__(self):
+        return len(self.flags)
+
+    def word(self, word_id):
+        return self.text[self.starts[word_id]:self.starts[word_id + 1] - 1]
+
+    def flag(self, word):
+        lo, hi = 0, len(self.flags)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.word(mid) < word:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self.flags) and self.word(lo) == word:
+            return self.flags[lo]
+        return 0
+
+    def get(self, variant):
+        bucket = zlib.crc32(variant.encode("utf-8")) % self.num_buckets
+        return [self.word(self.word_ids[i]) for i in range(self.offsets[bucket], self.offsets[bucket + 1])]
+
+    def items(self):
+        return ((self.word(word_id), flag) for word_id, flag in enumerate(self.flags))
+
+class SymSpellIndex:
+    # Kamus penghapusan ala SymSpell: setiap kata didaftarkan di bawah semua
+    # varian prefiksnya yang kehilangan hingga max_distance huruf. Query
+    # cukup membangkitkan varian yang sama lalu memverifikasi kandidat,
+    # tanpa menghitung edit distance ke seluruh kosakata.
+    # Kata yang dimuat dari disk berada di lapisan frozen; kata yang
+    # ditambahkan sesudahnya masuk ke words/deletes biasa.
+    def __init__(self, max_distance=MAX_EDIT_DISTANCE, prefix_length=PREFIX_LENGTH):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.words = {}
+        self.deletes = {}
+        self.frozen = None
+
+    def __len__(self):
+        if self.frozen is None:
+            return len(self.words)
+        return len(self.frozen) + sum(1 for word in self.words if not self.frozen.flag(word))
+
+    def __contains__(self, word):
+        return self.flags(word) != 0
+
+    def flags(self, word):
+        flags = self.words.get(word, 0)
+        if self.frozen is not None:
+            flags |= self.frozen.flag(word)
+        return flags
+
+    def _variants(self, word, distance):
+        variants = {word}
+        frontier = {word}
+        for _ in range(distance):
+            next_frontier = set()
+            for item in frontier:
+                if len(item) <= 1:
+                    continue
+                for i in range(len(item)):
+                    next_frontier.add(item[:i] + item[i + 1:])
+            next_frontier -= variants
+            variants |= next_frontier
+            frontier = next_frontier
+        return variants
+
+    def add(self, word, flags=INDEXED):
+        current = self.flags(word)
+        if current:
+            if current & flags != flags:
+                self.words[word] = current | flags
+            return False
+        self.words[word] = flags
+        for variant in self._variants(word[:self.prefix_length], self.max_distance):
+            self.deletes.setdefault(variant, []).append(word)
+        return True
+
+    def update(self, words, flags=INDEXED):
+        added = 0
+        for word in words:
+            if len(word) >= MIN_TERM_LENGTH and word.isalpha():
+                added += self.add(word, flags)
+        return added
+
+    def lookup(self, term, max_distance=None, accept=None):
+        if max_distance is None:
+            max_distance = self.max_distance
+        max_distance = min(max_distance, self.max_distance)
+        found = {}
+        prefix = term[:self.prefix_length]
+        for variant in self._variants(prefix, max_distance):
+            words = self.deletes.get(variant, ())
+            if self.frozen is not None:
+                words = list(words) + self.frozen.get(variant)
+            for word in words:
+                if word in found:
+                    continue
+                if accept is not None and not accept(word):
+                    found[word] = max_distance + 1
+                    continue
+                found[word] = edit_distance(term, word, max_distance)
+        return sorted(
+            ((word, distance) for word, distance in found.items() if distance <= max_distance),
+            key=lambda x: (x[1], x[0])
+        )
+
+    def correct(self, term, doc_freq):
+        # Hanya term yang ada di index aktif yang layak jadi koreksi. Kata
+        # yang sudah baku menurut kamus kata dasar hanya dikoreksi pada
+        # jarak 1 agar istilah sah tidak "dibetulkan" menjadi kata lain.
+        if len(term) < MIN_TERM_LENGTH or not term.isalpha():
+            return None
+        max_distance = 1 if self.flags(term) & DICTIONARY else self.max_distance
+        # Jarak 1 dicoba lebih dulu: varian hapusnya jauh lebih sedikit dan
+        # sebagian besar salah ketik cukup satu huruf.
+        for distance in range(1, max_distance + 1):
+            candidates = [word for word, d in self.lookup(term, distance, doc_freq.__contains__) if d > 0]
+            if candidates:
+                return min(candidates, key=lambda word: (-doc_freq[word], word))
+        return None
+
+    def compact(self):
+        # Salinan read-only dengan seluruh kata di lapisan frozen, untuk
+        # disimpan ke disk.
+        if not self.words and self.frozen is not None:
+            return self
+        words = dict(self.frozen.items()) if self.frozen is not None else {}
+        words.update(self.words)
+        compacted = SymSpellIndex(self.max_distance, self.prefix_length)
+        compacted.frozen = _FrozenDeletes(
+            words, lambda word: self._variants(word[:self.prefix_length], self.max_distance)
+        )
+        return compacted